@@ -1,4 +1,5 @@
 from main.plot import LivePlot
+from main.seeding import derive_seed
 import random
 import torch
 import copy
@@ -14,23 +15,29 @@ class ReplayMemory:
     Args:
     - capacity (int): Maximum capacity of the memory buffer.
     - device (str): Device to use for computation ('cpu' or 'cuda').
+    - seed (int): Seed for sampling batches (None for an unseeded run).
+    - trace (RunTrace): Optional trace the sampled indices are logged to or replayed from.
 
     Attributes not listed in Args:
     - memory (list): List storing transitions in the memory buffer.
     - position (int): Current position in the memory buffer.
+    - rng (random.Random): Random number generator used for sampling batches.
 
     Methods:
     - insert(transition): Inserts a transition into the replay memory.
+    - load_dataset(dataset, limit): Streams transitions from a recorded dataset into the replay memory.
     - sample(batch_size): Samples a batch of transitions from the memory.
     - can_sample(batch_size): Checks if enough transitions are available to sample.
     - __len__(): Returns the current length of the memory buffer.
     """
 
-    def __init__(self, capacity, device = "cpu"):
+    def __init__(self, capacity, device = "cpu", seed = None, trace = None):
         self.capacity = capacity
         self.memory = []
         self.position = 0
         self.device = device
+        self.rng = random.Random(seed)
+        self.trace = trace
 
     def insert(self, transition):
         """
@@ -48,6 +55,29 @@ class ReplayMemory:
             self.memory.remove(self.memory[0])
             self.memory.append(transition)
 
+    def load_dataset(self, dataset, limit = None):
+        """
+        Streams transitions from a recorded dataset into the replay memory.
+
+        Args:
+        - dataset (DatasetReader): Recorded dataset to load transitions from.
+        - limit (int): Maximum number of transitions to load (defaults to the memory capacity).
+
+        Returns:
+        - The number of loaded transitions.
+        """
+
+        limit = self.capacity if limit is None else limit
+        loaded = 0
+
+        for transition in dataset:
+            if loaded >= limit:
+                break
+            self.insert(transition)
+            loaded += 1
+
+        return loaded
+
     def sample(self, batch_size = 32):
         """
         Samples a batch of transitions from the memory.
@@ -61,8 +91,12 @@ class ReplayMemory:
 
         assert self.can_sample(batch_size)
 
-        batch = random.sample(self.memory, batch_size)
-        batch = zip(*batch)
+        indices = self.rng.sample(range(len(self.memory)), batch_size)
+
+        if self.trace is not None:
+            indices = self.trace.log("sample", indices)
+
+        batch = zip(*[self.memory[i] for i in indices])
         
         return [torch.cat(items).to(self.device) for items in batch]
     
@@ -104,17 +138,23 @@ class Agent:
     - memory_capacity (int): Capacity of the experience replay memory.
     - batch_size (int): Batch size for training.
     - learning_rate (float): Learning rate for the optimizer.
+    - seed (int): Run-level seed, separate sub-seeds are derived for exploration and replay sampling (None for an unseeded run).
+    - trace (RunTrace): Optional trace the action and sample index stream is logged to or replayed from.
+    - model_dir (str): Directory the model checkpoints are saved to.
 
     Methods:
     - get_action(state): Chooses an action based on the epsilon-greedy policy.
-    - train(env, epochs): Trains the agent using the provided environment for a given number of epochs.
-    - test(env, games_amount): Evaluates the trained agent in the environment for a specified number of games.
+    - optimize(): Performs a single gradient step on a batch sampled from the replay memory.
+    - pretrain(dataset, epochs, target_update): Pretrains the model offline on a recorded dataset.
+    - train(env, epochs, recorder): Trains the agent using the provided environment for a given number of epochs.
+    - test(env, games_amount, recorder): Evaluates the trained agent in the environment for a specified number of games.
     """
     
     def __init__(self, model, device, epsilon, min_epsilon, nb_warmup,
-                 nb_actions, memory_capacity, batch_size, learning_rate) -> None:
+                 nb_actions, memory_capacity, batch_size, learning_rate, seed = None, trace = None, model_dir = "models") -> None:
         
-        self.memory = ReplayMemory(device = device, capacity = memory_capacity)
+        replay_seed = derive_seed(seed, "replay") if seed is not None else None
+        self.memory = ReplayMemory(device = device, capacity = memory_capacity, seed = replay_seed, trace = trace)
         self.model = model
         self.target_model = copy.deepcopy(model).eval()
         self.epsilon = epsilon
@@ -125,6 +165,14 @@ class Agent:
         self.target_model.to(device)
         self.gamma = 0.99
         self.nb_actions = nb_actions
+        self.trace = trace
+        self.model_dir = model_dir
+
+        self.generator = torch.Generator()
+        if seed is not None:
+            self.generator.manual_seed(derive_seed(seed, "exploration"))
+        else:
+            self.generator.seed()
 
         self.optimizer = optim.Adam(model.parameters(), lr = learning_rate)
 
@@ -141,13 +189,77 @@ class Agent:
         - A tensor representing the chosen action.
         """
         
-        if torch.rand(1) < self.epsilon:
-            return torch.randint(self.nb_actions, (1, 1))
+        if torch.rand(1, generator = self.generator) < self.epsilon:
+            action = torch.randint(self.nb_actions, (1, 1), generator = self.generator)
         else:
             av = self.model(state).detach()
-            return torch.argmax(av, dim = 1, keepdim = True)
+            action = torch.argmax(av, dim = 1, keepdim = True).cpu()
+
+        if self.trace is not None:
+            action = torch.tensor([[self.trace.log("action", action.item())]])
+
+        return action
         
-    def train(self, env, epochs):
+    def optimize(self):
+        """
+        Performs a single gradient step on a batch sampled from the replay memory.
+
+        Returns:
+        - The loss value of the batch.
+        """
+
+        state_b, action_b, reward_b, done_b, next_state_b = self.memory.sample(self.batch_size)
+        qsa_b = self.model(state_b).gather(1, action_b)
+        next_qsa_b = self.target_model(next_state_b)
+        next_qsa_b = torch.max(next_qsa_b, dim = 1, keepdim = True)[0]
+        target_b = reward_b + ~done_b * self.gamma * next_qsa_b
+        loss = F.mse_loss(qsa_b, target_b)
+        self.model.zero_grad()
+        loss.backward()
+        self.optimizer.step()
+
+        return loss.item()
+
+    def pretrain(self, dataset, epochs = 1, target_update = 10000):
+        """
+        Pretrains the model offline on a recorded dataset before online training starts.
+        Transitions are streamed from the dataset into the replay memory and a gradient step
+        is taken for every inserted transition, just like during online training.
+
+        Args:
+        - dataset (DatasetReader): Recorded dataset to stream transitions from.
+        - epochs (int): Number of passes over the dataset.
+        - target_update (int): Number of gradient steps between target network updates.
+
+        Returns:
+        - List of the average loss of every pass over the dataset.
+        """
+
+        avg_losses = []
+        steps = 0
+
+        for epoch in range(1, epochs + 1):
+            losses = []
+
+            for transition in dataset:
+                self.memory.insert(transition)
+
+                if self.memory.can_sample(self.batch_size):
+                    losses.append(self.optimize())
+                    steps += 1
+
+                    if steps % target_update == 0:
+                        self.target_model.load_state_dict(self.model.state_dict())
+
+            avg_losses.append(np.mean(losses) if losses else float("nan"))
+            print(f"Pretrain epoch: {epoch} - Average Loss: {avg_losses[-1]}")
+
+        self.target_model.load_state_dict(self.model.state_dict())
+        self.model.save_the_model(f"{self.model_dir}/latest.pt")
+
+        return avg_losses
+
+    def train(self, env, epochs, recorder = None):
         """
         Trains the agent using the provided environment for a given number of epochs. This is the
         main training loop that is called from the train.py file.
@@ -155,6 +267,7 @@ class Agent:
         Args:
         - env (gym.Env): Gym environment.
         - epochs (int): Number of epochs to train the agent.
+        - recorder (DatasetWriter): Optional dataset writer that records every transition for offline reuse.
 
         Returns:
         - Dictionary containing training statistics: {"Returns": [], "AvgReturns": [], "EpsilonCheckpoints": []}
@@ -164,71 +277,74 @@ class Agent:
 
         plotter = LivePlot()
 
-        for epoch in range(1, epochs + 1):
-            state = env.reset()
-            done = False
-            ep_return = 0
+        try:
+            for epoch in range(1, epochs + 1):
+                state = env.reset()
+                done = False
+                ep_return = 0
 
-            while not done:
-                action = self.get_action(state)
+                while not done:
+                    action = self.get_action(state)
 
-                next_state, reward, done, info = env.step(action)
+                    next_state, reward, done, info = env.step(action)
 
-                self.memory.insert([state, action, reward, done, next_state])
+                    self.memory.insert([state, action, reward, done, next_state])
 
-                if self.memory.can_sample(self.batch_size):
-                    state_b, action_b, reward_b, done_b, next_state_b = self.memory.sample(self.batch_size)
-                    qsa_b = self.model(state_b).gather(1, action_b)
-                    next_qsa_b = self.target_model(next_state_b)
-                    next_qsa_b = torch.max(next_qsa_b, dim = 1, keepdim = True)[0]
-                    target_b = reward_b + ~done_b * self.gamma * next_qsa_b
-                    loss = F.mse_loss(qsa_b, target_b)
-                    self.model.zero_grad()
-                    loss.backward()
-                    self.optimizer.step()
+                    if recorder is not None:
+                        recorder.insert([state, action, reward, done, next_state])
 
-                state = next_state
-                ep_return += reward.item()
+                    if self.memory.can_sample(self.batch_size):
+                        self.optimize()
 
-            stats["Returns"].append(ep_return)
+                    state = next_state
+                    ep_return += reward.item()
 
-            if self.epsilon > self.min_epsilon:
-                self.epsilon = self.epsilon * self.epsilon_decay
+                stats["Returns"].append(ep_return)
 
-            if epoch % 20 == 0:
-                self.model.save_the_model()
-                print(" ")
+                if self.epsilon > self.min_epsilon:
+                    self.epsilon = self.epsilon * self.epsilon_decay
 
-                average_returns = np.mean(stats["Returns"][-100:])
+                if epoch % 20 == 0:
+                    self.model.save_the_model(f"{self.model_dir}/latest.pt")
+                    print(" ")
 
-                stats["AvgReturns"].append(average_returns)
-                stats["EpsilonCheckpoints"].append(self.epsilon)
+                    average_returns = np.mean(stats["Returns"][-100:])
 
-                if (len(stats["Returns"])) > 100:
-                    print(f"Epoch: {epoch} - Average Return: {np.mean(stats['Returns'][-100:])} - Epsilon: {self.epsilon}")
+                    stats["AvgReturns"].append(average_returns)
+                    stats["EpsilonCheckpoints"].append(self.epsilon)
+
+                    if (len(stats["Returns"])) > 100:
+                        print(f"Epoch: {epoch} - Average Return: {np.mean(stats['Returns'][-100:])} - Epsilon: {self.epsilon}")
                 
-                else:
-                    print(f"Epoch: {epoch} - Episode Return: {np.mean(stats['Returns'][-1:])} - Epsilon: {self.epsilon}")
+                    else:
+                        print(f"Epoch: {epoch} - Episode Return: {np.mean(stats['Returns'][-1:])} - Epsilon: {self.epsilon}")
 
-            if epoch % 50 == 0:
-                self.target_model.load_state_dict(self.model.state_dict())
+                if epoch % 50 == 0:
+                    self.target_model.load_state_dict(self.model.state_dict())
             
-            if epoch % 100 == 0:
-                plotter.update_plot(stats)
+                if epoch % 100 == 0:
+                    plotter.update_plot(stats)
+
+                if epoch % 1000 == 0:
+                    self.model.save_the_model(f"{self.model_dir}/model_iter_{epoch}.pt")
+        finally:
+            if recorder is not None:
+                recorder.close()
 
-            if epoch % 1000 == 0:
-                self.model.save_the_model(f"models/model_iter_{epoch}.pt")
+            if self.trace is not None:
+                self.trace.close()
 
         return stats
     
 
-    def test(self, env, games_amount):
+    def test(self, env, games_amount, recorder = None):
         """
         Evaluates the trained agent in the environment for a specified number of games.
 
         Args:
         - env (gym.Env): Gym environment for testing.
         - games_amount (int): Number of games to play for evaluation.
+        - recorder (DatasetWriter): Optional dataset writer that records every transition for offline reuse.
 
         Returns:
         - None (Writes the rendered frames to a video file for evaluation).
@@ -236,18 +352,27 @@ class Agent:
 
         writer = imageio.get_writer('./videos/game_video_test.mp4', fps = 30)
 
-        for epoch in range(games_amount):
-            state = env.reset()
+        try:
+            for epoch in range(games_amount):
+                state = env.reset()
 
-            done = False
+                done = False
 
-            for _ in range(1000):
-                action = self.get_action(state)
-                state, reward, done, info = env.step(action)
-                frame = env.render('rgb_array')
-                writer.append_data(frame)
-                if done:
-                    break
-        
-        writer.close()
-        env.close()
\ No newline at end of file
+                for _ in range(1000):
+                    action = self.get_action(state)
+                    next_state, reward, done, info = env.step(action)
+
+                    if recorder is not None:
+                        recorder.insert([state, action, reward, done, next_state])
+
+                    state = next_state
+                    frame = env.render('rgb_array')
+                    writer.append_data(frame)
+                    if done:
+                        break
+        finally:
+            if recorder is not None:
+                recorder.close()
+
+            writer.close()
+            env.close()
\ No newline at end of file
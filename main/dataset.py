@@ -0,0 +1,207 @@
+import numpy as np
+import torch
+import glob
+import os
+
+class DatasetWriter:
+    """
+    DatasetWriter: A class for recording transitions to disk as a chunked, columnar dataset.
+
+    Every chunk is a compressed .npz file holding one array per column:
+    "frames" (uint8, K x 84 x 84), "state_indices" (int64, N), "actions" (int64, N),
+    "rewards" (float32, N) and "dones" (bool, N). The state of transition i is
+    frames[state_indices[i]] and its next state is the frame right after it. Within an
+    episode the next state is the following transition's state, so it is stored only once
+    and an extra frame is only stored where the chain breaks (episode ends and chunk starts).
+
+    Args:
+    - directory (str): Directory the chunk files are written to.
+    - chunk_size (int): Number of transitions stored in a single chunk file.
+
+    Attributes not listed in Args:
+    - buffer (dict): Columns of the transitions that have not been written yet.
+    - chunks_written (int): Number of chunk files written so far.
+
+    Methods:
+    - insert(transition): Adds a transition to the dataset.
+    - flush(): Writes the buffered transitions to a new chunk file.
+    - close(): Flushes the remaining transitions.
+    """
+
+    def __init__(self, directory, chunk_size = 10000):
+        self.directory = directory
+        self.chunk_size = chunk_size
+        self.buffer = {"frames": [], "state_indices": [], "actions": [], "rewards": [], "dones": []}
+
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+
+        self.chunks_written = len(glob.glob(os.path.join(directory, "chunk_*.npz")))
+
+    def insert(self, transition):
+        """
+        Adds a transition to the dataset and writes a chunk once enough transitions are buffered.
+
+        Args:
+        - transition (tuple): A tuple containing the elements of the transition (state, action, reward, done, next_state).
+        """
+
+        state, action, reward, done, next_state = [item.detach().to('cpu') for item in transition]
+
+        state = frame_to_uint8(state)
+        frames = self.buffer["frames"]
+
+        if not frames or not np.array_equal(frames[-1], state):
+            frames.append(state)
+
+        self.buffer["state_indices"].append(len(frames) - 1)
+        self.buffer["actions"].append(action.item())
+        self.buffer["rewards"].append(reward.item())
+        self.buffer["dones"].append(done.item())
+        frames.append(frame_to_uint8(next_state))
+
+        if len(self.buffer["actions"]) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes the buffered transitions to a new chunk file.
+        """
+
+        if not self.buffer["actions"]:
+            return
+
+        filename = os.path.join(self.directory, f"chunk_{self.chunks_written:05d}.npz")
+
+        np.savez_compressed(filename,
+                            frames = np.stack(self.buffer["frames"]),
+                            state_indices = np.array(self.buffer["state_indices"], dtype = np.int64),
+                            actions = np.array(self.buffer["actions"], dtype = np.int64),
+                            rewards = np.array(self.buffer["rewards"], dtype = np.float32),
+                            dones = np.array(self.buffer["dones"], dtype = bool))
+
+        self.chunks_written += 1
+        self.buffer = {key: [] for key in self.buffer}
+
+    def close(self):
+        """
+        Flushes the remaining transitions.
+        """
+
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class DatasetReader:
+    """
+    DatasetReader: A class for streaming transitions from a dataset written by DatasetWriter.
+
+    Chunks are loaded lazily one at a time, so only a single chunk is kept in memory.
+
+    Args:
+    - directory (str): Directory containing the chunk files.
+
+    Attributes not listed in Args:
+    - chunk_files (list): Sorted list of chunk file paths.
+
+    Methods:
+    - chunks(): Yields the chunks as dictionaries of numpy arrays.
+    - num_chunks(): Returns the number of chunk files.
+    - num_transitions(): Returns the number of transitions in the dataset.
+    - __iter__(): Yields transitions in the format used by ReplayMemory.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.chunk_files = sorted(glob.glob(os.path.join(directory, "chunk_*.npz")))
+
+        if not self.chunk_files:
+            raise FileNotFoundError(f"No dataset chunks found in {directory}")
+
+    def chunks(self):
+        """
+        Yields the chunks as dictionaries of numpy arrays.
+
+        Returns:
+        - A generator of dictionaries with the keys "frames", "state_indices", "actions", "rewards" and "dones".
+        """
+
+        for filename in self.chunk_files:
+            with np.load(filename) as chunk:
+                yield {key: chunk[key] for key in chunk.files}
+
+    def __iter__(self):
+        """
+        Yields transitions in the format used by ReplayMemory.
+
+        Returns:
+        - A generator of transitions: [state, action, reward, done, next_state]
+        """
+
+        for chunk in self.chunks():
+            frames = chunk["frames"]
+
+            for i, index in enumerate(chunk["state_indices"]):
+                yield [frame_to_tensor(frames[index]),
+                       torch.tensor(chunk["actions"][i]).view(1, -1),
+                       torch.tensor(chunk["rewards"][i]).view(1, -1),
+                       torch.tensor(chunk["dones"][i]).view(1, -1),
+                       frame_to_tensor(frames[index + 1])]
+
+    def num_chunks(self):
+        """
+        Returns the number of chunk files.
+
+        Returns:
+        - The number of chunk files in the dataset.
+        """
+
+        return len(self.chunk_files)
+
+    def num_transitions(self):
+        """
+        Returns the number of transitions in the dataset (only the action column of every chunk is read).
+
+        Returns:
+        - The total number of transitions in the dataset.
+        """
+
+        total = 0
+
+        for filename in self.chunk_files:
+            with np.load(filename) as chunk:
+                total += len(chunk["actions"])
+
+        return total
+
+
+def frame_to_uint8(frame):
+    """
+    Converts a preprocessed frame to a uint8 array.
+
+    Args:
+    - frame (torch.Tensor): Preprocessed frame of shape (1, 1, 84, 84) with values in [0, 1].
+
+    Returns:
+    - An uint8 numpy array of shape (84, 84).
+    """
+
+    return (frame.squeeze() * 255).round().to(torch.uint8).numpy()
+
+def frame_to_tensor(frame):
+    """
+    Converts a uint8 frame back to the tensor format produced by GymWrapperBase.
+
+    Args:
+    - frame (np.ndarray): An uint8 array of shape (84, 84).
+
+    Returns:
+    - A float tensor of shape (1, 1, 84, 84) with values in [0, 1].
+    """
+
+    return torch.from_numpy(frame).unsqueeze(0).unsqueeze(0) / 255.0
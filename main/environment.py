@@ -2,6 +2,7 @@ import gym
 import numpy as np
 from PIL import Image
 import torch
+from main.seeding import derive_seed
 
 class GymWrapperBase(gym.Wrapper):
     """
@@ -12,12 +13,14 @@ class GymWrapperBase(gym.Wrapper):
     - render_mode (str): Mode for rendering the environment.
     - repeat (int): Number of times to repeat an action.
     - device (str): Device to use for computation ('cpu' or 'cuda').
+    - seed (int): Run-level seed, the first reset is seeded with a sub-seed derived from it (None for an unseeded environment).
 
     Attributes not listed in Args:
     - repeat (int): Number of times to repeat an action.
     - lives (int): Number of lives in the environment.
     - frame_buffer (list): Buffer to store frames.
     - image_shape (tuple): Shape of the image (height, width).
+    - reset_seed (int): Seed for the next reset (only the first reset is seeded).
 
     Methods:
     - step(action): Executes an action in the environment.
@@ -25,7 +28,7 @@ class GymWrapperBase(gym.Wrapper):
     - reset(): Resets the environment and returns the initial observation.
     """
 
-    def __init__(self, env_name, render_mode = "rgb_array", repeat = 4, device = "cpu"):
+    def __init__(self, env_name, render_mode = "rgb_array", repeat = 4, device = "cpu", seed = None):
         """
         Initializes the GymWrapperBase class.
 
@@ -34,15 +37,18 @@ class GymWrapperBase(gym.Wrapper):
         - render_mode (str): Mode for rendering the environment.
         - repeat (int): Number of times to repeat an action.
         - device (str): Device to use for computation ('cpu' or 'cuda').
+        - seed (int): Run-level seed, the first reset is seeded with a sub-seed derived from it (None for an unseeded environment).
         """
 
         env = gym.make(env_name, render_mode = render_mode)
         super(GymWrapperBase, self).__init__(env)
+
         self.repeat = repeat
         self.lives = env.ale.lives()
         self.frame_buffer = []
         self.device = device
         self.image_shape = (84, 84)
+        self.reset_seed = derive_seed(seed, "env") if seed is not None else None
 
     def step(self, action):
         """
@@ -116,7 +122,13 @@ class GymWrapperBase(gym.Wrapper):
         """
 
         self.frame_buffer = []
-        observation = self.env.reset()
+
+        if self.reset_seed is not None:
+            observation = self.env.reset(seed = self.reset_seed)
+            self.reset_seed = None
+        else:
+            observation = self.env.reset()
+
         self.lives = self.env.ale.lives()
         observation = self.process_observation(observation)
         return observation
@@ -130,10 +142,11 @@ class DQNBreakout(GymWrapperBase):
     - render_mode (str): Mode for rendering the environment.
     - repeat (int): Number of times to repeat an action.
     - device (str): Device to use for computation ('cpu' or 'cuda').
+    - seed (int): Run-level seed, the first reset is seeded with a sub-seed derived from it (None for an unseeded environment).
     """
 
-    def __init__(self, render_mode = "rgb_array", repeat = 4, device="cpu"):
-        super(DQNBreakout, self).__init__("BreakoutNoFrameskip-v4", render_mode, repeat, device)
+    def __init__(self, render_mode = "rgb_array", repeat = 4, device="cpu", seed = None):
+        super(DQNBreakout, self).__init__("BreakoutNoFrameskip-v4", render_mode, repeat, device, seed)
 
 class DQNPong(GymWrapperBase):
     """
@@ -144,10 +157,11 @@ class DQNPong(GymWrapperBase):
     - render_mode (str): Mode for rendering the environment.
     - repeat (int): Number of times to repeat an action.
     - device (str): Device to use for computation ('cpu' or 'cuda').
+    - seed (int): Run-level seed, the first reset is seeded with a sub-seed derived from it (None for an unseeded environment).
     """
 
-    def __init__(self, render_mode = "rgb_array", repeat = 4, device="cpu"):
-        super(DQNPong, self).__init__("Pong-ramNoFrameskip-v4", render_mode, repeat, device)
+    def __init__(self, render_mode = "rgb_array", repeat = 4, device="cpu", seed = None):
+        super(DQNPong, self).__init__("Pong-ramNoFrameskip-v4", render_mode, repeat, device, seed)
 
 class DQNSpaceInvaders(GymWrapperBase):
     """
@@ -158,7 +172,8 @@ class DQNSpaceInvaders(GymWrapperBase):
     - render_mode (str): Mode for rendering the environment.
     - repeat (int): Number of times to repeat an action.
     - device (str): Device to use for computation ('cpu' or 'cuda').
+    - seed (int): Run-level seed, the first reset is seeded with a sub-seed derived from it (None for an unseeded environment).
     """
 
-    def __init__(self, render_mode = "rgb_array", repeat = 3, device="cpu"):
-        super(DQNSpaceInvaders, self).__init__("SpaceInvaders-ramNoFrameskip-v4", render_mode, repeat, device)
+    def __init__(self, render_mode = "rgb_array", repeat = 3, device="cpu", seed = None):
+        super(DQNSpaceInvaders, self).__init__("SpaceInvaders-ramNoFrameskip-v4", render_mode, repeat, device, seed)
@@ -89,7 +89,7 @@ class AtariNet(nn.Module):
         action_value = self.action_value3(action_value)
 
         # Final output combining state and action values
-        output = state_value + (action_value - action_value.mean())
+        output = state_value + (action_value - action_value.mean(dim = 1, keepdim = True))
 
         return output
 
@@ -101,8 +101,9 @@ class AtariNet(nn.Module):
         - weights_filename (str): Name of the file to save the weights.
         """
 
-        if not os.path.exists("models"):
-            os.mkdir("models")
+        directory = os.path.dirname(weights_filename)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
         torch.save(self.state_dict(), weights_filename)
 
     def load_the_model(self, weights_filename = "models/latest.pt"):
@@ -111,10 +112,15 @@ class AtariNet(nn.Module):
 
         Args:
         - weights_filename (str): Name of the file containing the weights to load.
+
+        Returns:
+        - True if the weights were loaded, otherwise False.
         """
 
         try:
-            self.load_state_dict(torch.load(weights_filename))
+            self.load_state_dict(torch.load(weights_filename, map_location = next(self.parameters()).device))
             print(f"Success! Loaded {weights_filename}")
+            return True
         except:
             print(f"No weights available at {weights_filename}")
+            return False
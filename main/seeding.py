@@ -0,0 +1,134 @@
+import numpy as np
+import random
+import torch
+import json
+import os
+
+STREAMS = ("global", "env", "exploration", "replay")
+
+def derive_seed(seed, stream):
+    """
+    Derives an independent sub-seed for one random number stream from the run-level seed.
+
+    Args:
+    - seed (int): Run-level seed.
+    - stream (str): Name of the stream, one of STREAMS.
+
+    Returns:
+    - An integer seed for the stream.
+    """
+
+    sequence = np.random.SeedSequence(seed).spawn(len(STREAMS))[STREAMS.index(stream)]
+    return int(sequence.generate_state(1)[0])
+
+def set_seed(seed):
+    """
+    Seeds the global random number generators (python, numpy and torch, used for weight
+    initialisation and dropout) and makes torch deterministic, also on CUDA.
+
+    This has to be called before the first CUDA operation, because cuBLAS reads its
+    workspace configuration when it is initialised.
+
+    Args:
+    - seed (int): Run-level seed.
+    """
+
+    os.environ.setdefault("CUBLAS_WORKSPACE_CONFIG", ":4096:8")
+
+    global_seed = derive_seed(seed, "global")
+
+    random.seed(global_seed)
+    np.random.seed(global_seed)
+    torch.manual_seed(global_seed)
+    torch.cuda.manual_seed_all(global_seed)
+
+    torch.backends.cudnn.deterministic = True
+    torch.backends.cudnn.benchmark = False
+    torch.use_deterministic_algorithms(True)
+
+
+class RunTrace:
+    """
+    RunTrace: A class for logging the action and sample index stream of a run so it can be replayed exactly.
+
+    In "record" mode every logged value is appended to a JSON lines file. In "replay" mode the values
+    are read back from the file instead, so the replayed run takes exactly the same actions and samples
+    exactly the same batches. Values that differ from the recorded ones are counted as divergences.
+
+    Args:
+    - filename (str): Path of the trace file.
+    - mode (str): Either "record" or "replay".
+
+    Attributes not listed in Args:
+    - step (int): Number of values logged so far.
+    - divergences (int): Number of replayed values that differed from the computed ones.
+    - first_divergence (int): Step of the first divergence (None if there was none).
+
+    Methods:
+    - log(kind, value): Logs a value (record mode) or returns the recorded one (replay mode).
+    - close(): Closes the trace file and reports divergences.
+    """
+
+    def __init__(self, filename, mode = "record"):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown trace mode: {mode}")
+
+        self.filename = filename
+        self.mode = mode
+        self.step = 0
+        self.divergences = 0
+        self.first_divergence = None
+
+        if mode == "record":
+            directory = os.path.dirname(filename)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+            self.file = open(filename, "w")
+        else:
+            self.file = open(filename, "r")
+
+    def log(self, kind, value):
+        """
+        Logs a value (record mode) or returns the recorded one (replay mode).
+
+        Args:
+        - kind (str): Kind of the value ("action" or "sample").
+        - value: The value computed by the current run (int or list of ints).
+
+        Returns:
+        - The value the run should use.
+        """
+
+        self.step += 1
+
+        if self.mode == "record":
+            self.file.write(json.dumps({"kind": kind, "value": value}) + "\n")
+            return value
+
+        line = self.file.readline()
+        if not line:
+            raise RuntimeError(f"Trace {self.filename} ended at step {self.step}")
+
+        entry = json.loads(line)
+        if entry["kind"] != kind:
+            raise RuntimeError(f"Trace {self.filename} expected '{entry['kind']}' but got '{kind}' at step {self.step}")
+
+        if entry["value"] != value:
+            self.divergences += 1
+            if self.first_divergence is None:
+                self.first_divergence = self.step
+
+        return entry["value"]
+
+    def close(self):
+        """
+        Closes the trace file and reports divergences.
+        """
+
+        self.file.close()
+
+        if self.mode == "replay":
+            if self.divergences:
+                print(f"Replay diverged {self.divergences} times in {self.step} steps (first at step {self.first_divergence})")
+            else:
+                print(f"Replay matched the trace for all {self.step} steps")
@@ -0,0 +1,328 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+import queue
+import json
+import time
+import numpy as np
+import torch
+
+class LatencyHistogram:
+    """
+    LatencyHistogram: A thread-safe histogram of request latencies.
+
+    Args:
+    - buckets (tuple): Upper bounds of the histogram buckets in milliseconds.
+
+    Attributes not listed in Args:
+    - counts (list): Number of observed latencies per bucket (the last one counts everything above the largest bound).
+    - total (int): Total number of observed latencies.
+    - sum (float): Sum of all observed latencies in milliseconds.
+
+    Methods:
+    - observe(latency_ms): Records a single latency.
+    - snapshot(): Returns the histogram as a dictionary.
+    """
+
+    def __init__(self, buckets = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0
+        self.sum = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, latency_ms):
+        """
+        Records a single latency.
+
+        Args:
+        - latency_ms (float): Latency of a request in milliseconds.
+        """
+
+        index = next((i for i, bound in enumerate(self.buckets) if latency_ms <= bound), len(self.buckets))
+
+        with self.lock:
+            self.counts[index] += 1
+            self.total += 1
+            self.sum += latency_ms
+
+    def snapshot(self):
+        """
+        Returns the histogram as a dictionary.
+
+        Returns:
+        - Dictionary with the keys "buckets", "counts", "total" and "mean_ms".
+        """
+
+        with self.lock:
+            return {"buckets": [f"<={bound}" for bound in self.buckets] + [f">{self.buckets[-1]}"],
+                    "counts": list(self.counts),
+                    "total": self.total,
+                    "mean_ms": self.sum / self.total if self.total else 0.0}
+
+
+class PolicyRequest:
+    """
+    PolicyRequest: A single pending observation waiting to be batched.
+
+    Args:
+    - observation (torch.Tensor): Preprocessed frame of shape (1, 1, 84, 84).
+
+    Attributes not listed in Args:
+    - event (threading.Event): Set once the result is available.
+    - action (int): Chosen action.
+    - q_values (list): Q-values of all actions.
+    - error (Exception): Error raised while answering the batch (None on success).
+    - cancelled (bool): Set once the caller stopped waiting, so the request is dropped from its batch.
+    - start (float): Time the request was created.
+    """
+
+    def __init__(self, observation):
+        self.observation = observation
+        self.event = threading.Event()
+        self.action = None
+        self.q_values = None
+        self.error = None
+        self.cancelled = False
+        self.start = time.perf_counter()
+
+
+class PolicyServer:
+    """
+    PolicyServer: A class serving greedy actions of a trained AtariNet with request micro-batching.
+
+    Concurrent requests are collected by a single worker thread until either max_batch_size
+    requests are waiting or max_latency_ms has passed since the first one arrived, and are then
+    answered with a single forward pass.
+
+    Args:
+    - model (torch.nn.Module): Trained neural network model (put in eval mode by the server).
+    - device (str): Device to use for computation ('cpu' or 'cuda').
+    - max_batch_size (int): Maximum number of requests answered by one forward pass.
+    - max_latency_ms (float): Maximum time to wait for more requests before running a batch.
+    - timeout (float): Maximum time in seconds a request waits for its result.
+    - max_body_size (int): Maximum size in bytes of a request body.
+
+    Attributes not listed in Args:
+    - requests (queue.Queue): Queue of pending requests.
+    - histogram (LatencyHistogram): Per-request latency histogram of the HTTP endpoint (parsing, batching, inference and serialisation).
+    - batch_sizes (list): Number of batches run per batch size.
+
+    Methods:
+    - start(): Starts the batching worker thread.
+    - stop(): Stops the batching worker thread.
+    - parse_observation(observation): Validates an observation and converts it to a uint8 frame.
+    - act(observation): Returns the action and Q-values for a single observation.
+    - metrics(): Returns the latency histogram and batch size statistics.
+    - serve(host, port): Serves the policy over HTTP until interrupted.
+    """
+
+    def __init__(self, model, device = "cpu", max_batch_size = 32, max_latency_ms = 5, timeout = 10, max_body_size = 65536):
+        self.model = model.to(device).eval()
+        self.device = device
+        self.max_batch_size = max_batch_size
+        self.max_latency_ms = max_latency_ms
+        self.timeout = timeout
+        self.max_body_size = max_body_size
+        self.requests = queue.Queue()
+        self.histogram = LatencyHistogram()
+        self.batch_sizes = [0] * (max_batch_size + 1)
+        self.running = False
+        self.worker = None
+
+    def start(self):
+        """
+        Starts the batching worker thread.
+        """
+
+        if self.running:
+            return
+
+        self.running = True
+        self.worker = threading.Thread(target = self.run_batches, daemon = True)
+        self.worker.start()
+
+    def stop(self):
+        """
+        Stops the batching worker thread.
+        """
+
+        self.running = False
+        if self.worker is not None:
+            self.worker.join()
+            self.worker = None
+
+    def parse_observation(self, observation):
+        """
+        Validates an observation and converts it to a uint8 frame.
+
+        Args:
+        - observation: Preprocessed 84 x 84 grayscale frame, either as raw bytes (7056 uint8 values)
+          or as an integer array/nested list with values in [0, 255].
+
+        Returns:
+        - A uint8 numpy array of shape (84, 84).
+        """
+
+        if isinstance(observation, (bytes, bytearray)):
+            if len(observation) != 84 * 84:
+                raise ValueError(f"Expected {84 * 84} bytes, got {len(observation)}")
+            return np.frombuffer(observation, dtype = np.uint8).reshape(84, 84)
+
+        observation = np.asarray(observation)
+
+        if observation.shape != (84, 84):
+            raise ValueError(f"Expected an observation of shape (84, 84), got {observation.shape}")
+        if observation.dtype.kind not in "iu":
+            raise ValueError(f"Expected integer pixel values, got {observation.dtype}")
+        if observation.min() < 0 or observation.max() > 255:
+            raise ValueError("Pixel values must be in [0, 255]")
+
+        return observation.astype(np.uint8)
+
+    def act(self, observation):
+        """
+        Returns the action and Q-values for a single observation.
+
+        Args:
+        - observation: Preprocessed 84 x 84 grayscale frame with values in [0, 255] (see parse_observation).
+
+        Returns:
+        - A tuple (action, q_values).
+        """
+
+        observation = torch.from_numpy(self.parse_observation(observation)).view(1, 1, 84, 84) / 255.0
+        request = PolicyRequest(observation)
+
+        self.requests.put(request)
+
+        if not request.event.wait(self.timeout):
+            request.cancelled = True
+            raise TimeoutError(f"No result within {self.timeout} seconds")
+        if request.error is not None:
+            raise RuntimeError(f"Inference failed: {request.error}") from request.error
+
+        return request.action, request.q_values
+
+    def run_batches(self):
+        """
+        Collects pending requests into batches and answers them until the server is stopped.
+        """
+
+        while self.running:
+            try:
+                batch = [self.requests.get(timeout = 0.1)]
+            except queue.Empty:
+                continue
+
+            deadline = batch[0].start + self.max_latency_ms / 1000
+
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self.requests.get(timeout = timeout))
+                except queue.Empty:
+                    break
+
+            batch = [request for request in batch if not request.cancelled]
+            if not batch:
+                continue
+
+            try:
+                states = torch.cat([request.observation for request in batch]).to(self.device)
+
+                with torch.no_grad():
+                    q_values = self.model(states).cpu()
+
+                actions = torch.argmax(q_values, dim = 1)
+
+                for request, action, q_value in zip(batch, actions.tolist(), q_values.tolist()):
+                    request.action = action
+                    request.q_values = q_value
+            except Exception as e:
+                for request in batch:
+                    request.error = e
+
+            for request in batch:
+                request.event.set()
+
+            self.batch_sizes[len(batch)] += 1
+
+    def metrics(self):
+        """
+        Returns the latency histogram and batch size statistics.
+
+        Returns:
+        - Dictionary with the keys "latency" and "batch_sizes".
+        """
+
+        return {"latency": self.histogram.snapshot(),
+                "batch_sizes": {size: count for size, count in enumerate(self.batch_sizes) if count}}
+
+    def serve(self, host = "127.0.0.1", port = 8000):
+        """
+        Serves the policy over HTTP until interrupted.
+
+        Endpoints:
+        - POST /act with either a raw body of 7056 uint8 pixels (Content-Type: application/octet-stream)
+          or a JSON body {"observation": <84 x 84 frame>} returns {"action": int, "q_values": [float]}.
+        - GET /metrics returns the latency histogram and batch size statistics.
+
+        Args:
+        - host (str): Host to bind to.
+        - port (int): Port to listen on.
+        """
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                if self.path != "/act":
+                    return self.send_json(404, {"error": "not found"})
+                start = time.perf_counter()
+                try:
+                    length = int(self.headers.get("Content-Length", 0))
+                    if length < 0 or length > server.max_body_size:
+                        raise ValueError(f"Content-Length must be between 0 and {server.max_body_size} bytes")
+                    body = self.rfile.read(length)
+                    if self.headers.get("Content-Type", "").split(";")[0].strip() == "application/octet-stream":
+                        observation = body
+                    else:
+                        observation = json.loads(body)["observation"]
+                    action, q_values = server.act(observation)
+                except (ValueError, TypeError, KeyError, OverflowError) as e:
+                    self.send_json(400, {"error": str(e)})
+                except Exception as e:
+                    self.send_json(500, {"error": str(e)})
+                else:
+                    self.send_json(200, {"action": action, "q_values": q_values})
+                server.histogram.observe((time.perf_counter() - start) * 1000)
+
+            def do_GET(self):
+                if self.path != "/metrics":
+                    return self.send_json(404, {"error": "not found"})
+                self.send_json(200, server.metrics())
+
+            def send_json(self, status, payload):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        httpd = ThreadingHTTPServer((host, port), Handler)
+        self.start()
+        print(f"Serving policy on http://{host}:{port}")
+
+        try:
+            httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            httpd.server_close()
+            self.stop()
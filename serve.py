@@ -0,0 +1,49 @@
+from main.model import AtariNet
+from main.serve import PolicyServer
+import torch
+import os
+import sys
+
+# This is the serving script for using a trained agent outside of the training scripts
+
+if __name__ == "__main__":
+    """
+    Serving script for answering observations with actions of a trained agent over HTTP.
+
+    Steps:
+    1. Load the neural network model and the trained weights once.
+    2. Configure the micro-batching parameters of the server.
+    3. Serve actions and Q-values on a local HTTP endpoint.
+
+    Usage:
+    Run this script and send POST requests to /act with a JSON body {"observation": <84 x 84 frame>},
+    where the frame is preprocessed the same way as in GymWrapperBase (grayscale values in [0, 255]).
+    Latency histograms are available with a GET request to /metrics.
+
+    Note:
+    Adjust nb_actions, max_batch_size and max_latency_ms based on the game and the expected load.
+    """
+
+    # Set environment variable to prevent KMP library error
+    os.environ['KMP_DUPLICATE_LIB_OK'] = "TRUE"
+
+    # Check available device (CPU or GPU)
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+
+    # Create an AtariNet model for the specified game
+    model = AtariNet(nb_actions = 6)  # Update nb_actions based on the game's action space
+
+    model.to(device)
+
+    # Load trained model weights (refuse to serve a randomly initialised network)
+    if not model.load_the_model():
+        sys.exit(1)
+
+    # Initialize the server with the micro-batching parameters
+    server = PolicyServer(model = model,
+                          device = device,
+                          max_batch_size = 32,  # Maximum number of requests answered by one forward pass
+                          max_latency_ms = 5)  # Maximum time to wait for more requests before running a batch
+
+    # Serve the policy until interrupted
+    server.serve(host = "127.0.0.1", port = 8000)
@@ -1,6 +1,7 @@
 from main.model import AtariNet
 from main.agent import Agent
 from main.environment import *
+from main.dataset import DatasetWriter
 import torch
 import os
 
@@ -50,6 +51,11 @@ if __name__ == "__main__":
                   memory_capacity = 25000,
                   batch_size = 32)
 
+    # Record the evaluation transitions for later offline reuse (set to None to skip)
+    record_dataset = None  # e.g. "datasets/spaceinvaders_eval"
+
+    recorder = DatasetWriter(record_dataset) if record_dataset is not None else None
+
     # Test the agent's performance in the environment for a specified number of games
     # Adjust games_amount based on how many games you want to see in the video in the "videos" folder
-    agent.test(env = environment, games_amount = 1)
+    agent.test(env = environment, games_amount = 1, recorder = recorder)
@@ -0,0 +1,76 @@
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("matplotlib")
+pytest.importorskip("imageio")
+
+from main.model import AtariNet
+from main.agent import Agent
+from main.seeding import RunTrace
+
+
+def make_agent(tmp_path, seed = None, trace = None):
+    return Agent(model = AtariNet(nb_actions = 4),
+                 device = "cpu",
+                 epsilon = 1,
+                 min_epsilon = 0.1,
+                 nb_warmup = 100,
+                 nb_actions = 4,
+                 memory_capacity = 100,
+                 batch_size = 2,
+                 learning_rate = 0.00025,
+                 seed = seed,
+                 trace = trace,
+                 model_dir = str(tmp_path / "models"))
+
+
+def fill_memory(agent, amount = 20):
+    for i in range(amount):
+        state = torch.full((1, 1, 84, 84), i / 255.0)
+        agent.memory.insert([state,
+                             torch.tensor([[i % 4]]),
+                             torch.tensor([[1.0]]),
+                             torch.tensor([[False]]),
+                             state])
+
+
+def test_agent_stores_model_dir(tmp_path):
+    agent = make_agent(tmp_path, seed = 0)
+
+    assert agent.model_dir == str(tmp_path / "models")
+
+
+def test_seeded_agents_share_action_and_sample_streams(tmp_path):
+    agents = [make_agent(tmp_path, seed = 0), make_agent(tmp_path, seed = 0)]
+    state = torch.zeros(1, 1, 84, 84)
+
+    for agent in agents:
+        fill_memory(agent)
+
+    actions = [[agent.get_action(state).item() for _ in range(20)] for agent in agents]
+    samples = [[agent.memory.sample(2)[1].tolist() for _ in range(5)] for agent in agents]
+
+    assert actions[0] == actions[1]
+    assert samples[0] == samples[1]
+
+
+def test_trace_replays_recorded_run(tmp_path):
+    filename = str(tmp_path / "run.jsonl")
+    state = torch.zeros(1, 1, 84, 84)
+
+    trace = RunTrace(filename, mode = "record")
+    agent = make_agent(tmp_path, seed = 0, trace = trace)
+    fill_memory(agent)
+    recorded = [agent.get_action(state).item() for _ in range(10)]
+    recorded_sample = agent.memory.sample(2)[1].tolist()
+    trace.close()
+
+    trace = RunTrace(filename, mode = "replay")
+    agent = make_agent(tmp_path, seed = 1, trace = trace)
+    fill_memory(agent)
+    replayed = [agent.get_action(state).item() for _ in range(10)]
+    replayed_sample = agent.memory.sample(2)[1].tolist()
+    trace.close()
+
+    assert replayed == recorded
+    assert replayed_sample == recorded_sample
@@ -1,7 +1,11 @@
 from main.model import AtariNet
 from main.agent import Agent
 from main.environment import *
+from main.dataset import DatasetReader, DatasetWriter
+from main.seeding import set_seed, RunTrace
 import os
+import sys
+import time
 import torch
 
 # This is the training script (adjust environment and hyperparameters
@@ -12,9 +16,10 @@ if __name__ == "__main__":
     Main training script for training an agent to play a game using Deep Q-Learning (DQN).
 
     Steps:
-    1. Set the appropriate environment and hyperparameters for the game.
+    1. Set the appropriate environment, hyperparameters and seed for the game.
     2. Initialize the environment, neural network model, and the DQN agent.
-    3. Train the agent using the specified environment and hyperparameters.
+    3. Optionally pre-fill the replay memory from, or pretrain the agent offline on, a recorded dataset.
+    4. Train the agent using the specified environment and hyperparameters.
 
     Usage:
     Run this script to train an agent for playing a game using DQN.
@@ -26,19 +31,39 @@ if __name__ == "__main__":
     # Set environment variable to prevent KMP library error
     os.environ['KMP_DUPLICATE_LIB_OK'] = "TRUE"
 
+    # Seed all random number generators for a reproducible run, e.g. for bisecting regressions (None for an unseeded run)
+    seed = None
+
+    if seed is not None:
+        set_seed(seed)
+
     # Check available device (CPU or GPU)
     device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 
+    # Log the action/sample index stream ("record") or replay a logged run exactly ("replay"), set to None to skip
+    trace_mode = None
+    trace = RunTrace("traces/run.jsonl", mode = trace_mode) if trace_mode is not None else None
+
     # Define the game environment
-    environment = DQNSpaceInvaders(device = device)  # Change environment as needed
+    environment = DQNSpaceInvaders(device = device, seed = seed)  # Change environment as needed
 
     # Create an AtariNet model for the specified game
     model = AtariNet(nb_actions = 6)  # Update nb_actions based on the game's action space
 
     model.to(device)
 
-    # Load pre-trained model weights if available
-    model.load_the_model()
+    # Fixed checkpoint a seeded run starts from (None starts from the seeded initialisation)
+    checkpoint = None  # e.g. "models/model_iter_1000.pt"
+
+    if seed is None:
+        # Load pre-trained model weights if available
+        model.load_the_model()
+        model_dir = "models"
+    else:
+        # Seeded runs never pick up models/latest.pt implicitly and save to their own directory
+        if checkpoint is not None and not model.load_the_model(checkpoint):
+            sys.exit(1)
+        model_dir = f"models/seed_{seed}_{time.strftime('%Y%m%d-%H%M%S')}"
 
     # Initialize the agent with specified hyperparameters
     agent = Agent(model = model,
@@ -49,7 +74,28 @@ if __name__ == "__main__":
                   nb_actions = 6,  # Update the number of actions for the specific game
                   learning_rate = 0.00025,
                   memory_capacity = 25000,
-                  batch_size = 32)
+                  batch_size = 32,
+                  seed = seed,
+                  trace = trace,
+                  model_dir = model_dir)
+
+    # Pre-fill the replay memory with previously recorded transitions (set to None to skip)
+    prefill_dataset = None  # e.g. "datasets/spaceinvaders"
+
+    if prefill_dataset is not None:
+        loaded = agent.memory.load_dataset(DatasetReader(prefill_dataset))
+        print(f"Loaded {loaded} transitions into the replay memory")
+
+    # Pretrain the agent offline on previously recorded transitions (set to None to skip)
+    pretrain_dataset = None  # e.g. "datasets/spaceinvaders"
+
+    if pretrain_dataset is not None:
+        agent.pretrain(dataset = DatasetReader(pretrain_dataset), epochs = 1)
+
+    # Record the transitions of this run for later offline reuse (set to None to skip)
+    record_dataset = None  # e.g. "datasets/spaceinvaders"
+
+    recorder = DatasetWriter(record_dataset) if record_dataset is not None else None
 
     # Train the agent using the specified environment and epochs
-    agent.train(env=environment, epochs = 5000)  # Adjust epochs based on training duration
+    agent.train(env=environment, epochs = 5000, recorder = recorder)  # Adjust epochs based on training duration